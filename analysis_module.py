@@ -3,16 +3,8 @@ import json
 from openai import OpenAI
 import config
 
-class CognitiveAnalyzer:
-    def __init__(self):
-        self.client = OpenAI(api_key=config.API_KEY, base_url=config.BASE_URL)
-
-    def analyze_text(self, text):
-        """
-        Task 1: Analyzes text for keywords, tense, and abstraction.
-        Returns a Python Dictionary (Structured Data).
-        """
-        system_prompt = """
+# ================= Prompts (used by evaluation) =================
+ANALYZE_SYSTEM_PROMPT = """
         你是一个心理学辅助分析系统，专门用于识别用户的“反刍思维”（Rumination）特征。
         请分析用户的输入，并提取以下三个维度的特征：
         1. 关键词 (keywords): 识别是否存在“为什么”(Why)、“本应该”(Should have)、“总是”(Always) 等反刍常用词。
@@ -29,7 +21,7 @@ class CognitiveAnalyzer:
         }
         """
 
-        user_prompt = f"""
+ANALYZE_USER_PROMPT = """
         请分析以下用户输入的文本：
         "{text}"
         
@@ -45,9 +37,54 @@ class CognitiveAnalyzer:
         输出:
         """
 
+DETECT_SYSTEM_PROMPT = """
+        你是一名基于认知行为疗法（CBT）理论的心理评估专家。你的任务是根据给定的文本分析特征（JSON），判断用户当前的思维模式是否属于“反刍思维”（Rumination）。
+
+        ### 1. 反刍思维的核心定义
+        反刍思维是一种**被动、重复、抽象**地关注自身痛苦及其原因和后果，而缺乏行动解决导向的思维模式。
+
+        ### 2. 判定逻辑（请严格按此优先级判断）
+        
+        **【符合反刍 (True)】**
+        必须同时满足以下至少两点，且无明显行动计划：
+        - **高抽象度 (High Abstraction)**：脱离具体情境，上升到性格归因（"我就是个失败者"）或普遍规律（"为什么倒霉的总是我"）。
+        - **时态僵化 (Fixated Time)**：沉溺于不可改变的“过去”(Past) 或对“未来”(Future) 的灾难化想象，而非关注“当下”(Present)。
+        - **消极循环 (Negative Loop)**：关键词包含绝对化词汇（总是、从未、所有）或无解的“为什么”提问。
+
+        **【不符合反刍 (False)】**
+        即使有负面情绪，符合以下任一情况即判定为 False：
+        - **具体化叙述 (Concrete)**：用户在描述具体的时间、地点、人物和事件过程（如："刚才吃饭排队被人插队了，我很生气"）。这是正常的情绪宣泄。
+        - **解决导向 (Solution-Oriented)**：虽然在分析过去，但目的是总结经验或制定下一步计划（如："下次我会记得提前定闹钟"）。这是建设性反思。
+        - **当下状态 (Present Focus)**：描述当下的身体感觉或正在进行的动作。
+
+        ### 3. 输出要求
+        请基于输入的特征数据，严格返回标准的 JSON 格式，不要包含Markdown标记或其他多余文本
+        格式如下：
+        {
+            "is_ruminating": true/false,
+            "reasoning": "简短的一句话理由，指出关键的判据（如：高抽象度+过去时态+自我攻击）"
+        }
+        """
+
+EVAL_PROMPTS = (ANALYZE_SYSTEM_PROMPT, ANALYZE_USER_PROMPT, DETECT_SYSTEM_PROMPT)
+
+class CognitiveAnalyzer:
+    def __init__(self):
+        self.client = OpenAI(api_key=config.API_KEY, base_url=config.BASE_URL)
+        self.model = config.ANALYZER_MODEL
+
+    def analyze_text(self, text):
+        """
+        Task 1: Analyzes text for keywords, tense, and abstraction.
+        Returns a Python Dictionary (Structured Data).
+        """
+        system_prompt = ANALYZE_SYSTEM_PROMPT
+
+        user_prompt = ANALYZE_USER_PROMPT.format(text=text)
+
         try:
             response = self.client.chat.completions.create(
-                model="deepseek-chat",
+                model=self.model,
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
@@ -74,38 +111,11 @@ class CognitiveAnalyzer:
         """
         Task 2: Binary Classification based on features.
         """
-        system_prompt = """
-        你是一名基于认知行为疗法（CBT）理论的心理评估专家。你的任务是根据给定的文本分析特征（JSON），判断用户当前的思维模式是否属于“反刍思维”（Rumination）。
-
-        ### 1. 反刍思维的核心定义
-        反刍思维是一种**被动、重复、抽象**地关注自身痛苦及其原因和后果，而缺乏行动解决导向的思维模式。
-
-        ### 2. 判定逻辑（请严格按此优先级判断）
-        
-        **【符合反刍 (True)】**
-        必须同时满足以下至少两点，且无明显行动计划：
-        - **高抽象度 (High Abstraction)**：脱离具体情境，上升到性格归因（"我就是个失败者"）或普遍规律（"为什么倒霉的总是我"）。
-        - **时态僵化 (Fixated Time)**：沉溺于不可改变的“过去”(Past) 或对“未来”(Future) 的灾难化想象，而非关注“当下”(Present)。
-        - **消极循环 (Negative Loop)**：关键词包含绝对化词汇（总是、从未、所有）或无解的“为什么”提问。
-
-        **【不符合反刍 (False)】**
-        即使有负面情绪，符合以下任一情况即判定为 False：
-        - **具体化叙述 (Concrete)**：用户在描述具体的时间、地点、人物和事件过程（如："刚才吃饭排队被人插队了，我很生气"）。这是正常的情绪宣泄。
-        - **解决导向 (Solution-Oriented)**：虽然在分析过去，但目的是总结经验或制定下一步计划（如："下次我会记得提前定闹钟"）。这是建设性反思。
-        - **当下状态 (Present Focus)**：描述当下的身体感觉或正在进行的动作。
-
-        ### 3. 输出要求
-        请基于输入的特征数据，严格返回标准的 JSON 格式，不要包含Markdown标记或其他多余文本
-        格式如下：
-        {
-            "is_ruminating": true/false,
-            "reasoning": "简短的一句话理由，指出关键的判据（如：高抽象度+过去时态+自我攻击）"
-        }
-        """
+        system_prompt = DETECT_SYSTEM_PROMPT
 
         try:
             response = self.client.chat.completions.create(
-                model="deepseek-chat",
+                model=self.model,
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": f"特征数据: {json.dumps(features, ensure_ascii=False)}"}
@@ -166,7 +176,7 @@ class CognitiveAnalyzer:
         messages.append({"role": "user", "content": current_text})
 
         response = self.client.chat.completions.create(
-            model="deepseek-chat",
+            model=self.model,
             messages=messages,
             stream=False
         )
@@ -3,8 +3,10 @@ import gradio as gr
 from faster_whisper import WhisperModel
 import logging
 import time
+import uuid
 import config
 from analysis_module import CognitiveAnalyzer
+from session_store import SessionStore
 
 # --- SETUP ---
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
@@ -27,12 +29,24 @@ except Exception as e:
 # 2. Initialize Brain (Logic Layer)
 brain = CognitiveAnalyzer()
 
-def pipeline(audio_filepath, chat_history):
+# 3. Session Store (State Layer)
+sessions = SessionStore(
+    max_turns=config.SESSION_MAX_TURNS,
+    max_bytes=config.SESSION_MAX_BYTES,
+    max_sessions=config.SESSION_MAX_COUNT,
+    ttl=config.SESSION_TTL,
+    db_path=config.SESSION_DB_PATH,
+    flush_interval=config.SESSION_FLUSH_INTERVAL,
+    persist_ttl=config.SESSION_PERSIST_TTL
+)
+
+def pipeline(audio_filepath, session_id):
     start_total = time.time()
     
     # --- PRE-CHECKS ---
-    if chat_history is None: chat_history = []
-    if audio_filepath is None: return chat_history, chat_history, None
+    if not session_id: return [], None
+    chat_history = sessions.get(session_id)
+    if audio_filepath is None: return chat_history, None
 
     logger.info(f"🎤 Audio received: {audio_filepath}")
 
@@ -41,10 +55,10 @@ def pipeline(audio_filepath, chat_history):
         segments, _ = stt_model.transcribe(audio_filepath, beam_size=config.BEAM_SIZE)
         user_text = " ".join([s.text for s in segments]).strip()
         logger.info(f"📝 Text: {user_text}")
-        if not user_text: return chat_history, chat_history, None
+        if not user_text: return chat_history, None
     except Exception as e:
         logger.error(f"❌ Transcribe Error: {e}")
-        return chat_history, chat_history, None
+        return chat_history, None
 
     # --- STEP 2: ANALYZE (TASK 1) ---
     # This is where we call the new module.
@@ -70,28 +84,43 @@ def pipeline(audio_filepath, chat_history):
     bot_reply = brain.chat_response(chat_history, user_text, is_ruminating, reasoning)
 
     # --- UPDATE UI ---
-    chat_history.append({"role": "user", "content": user_text})
-    chat_history.append({"role": "assistant", "content": bot_reply})
+    chat_history = sessions.append(session_id, user_text, bot_reply)
     
     logger.info(f"⏱️ Total Time: {time.time() - start_total:.2f}s")
-    return chat_history, chat_history, None
+    logger.info(f"🗂️ Sessions: {sessions.metrics()}")
+    return chat_history, None
+
+def restore_session(session_id):
+    # The id lives in the browser's localStorage, so it survives reloads and restarts.
+    session_id = session_id or uuid.uuid4().hex
+    return session_id, sessions.get(session_id)
+
+def clear_session(session_id):
+    if session_id: sessions.clear(session_id)
 
 # --- UI LAUNCHER ---
 with gr.Blocks(title="Cognitive Mirror") as app:
     gr.Markdown("## 🧠 Cognitive Mirror (Meta-Cognitive Agent)")
     
     chatbot = gr.Chatbot(height=500)
-    state = gr.State([]) 
+    session_key = gr.BrowserState(
+        None, storage_key="cognitive_mirror_session", secret=config.SESSION_SECRET
+    )
     
     with gr.Row():
         audio_input = gr.Audio(sources=["microphone"], type="filepath", label="Voice Input")
-        clear_btn = gr.ClearButton([chatbot, state, audio_input])
+        clear_btn = gr.ClearButton([chatbot, audio_input])
 
     audio_input.stop_recording(
         pipeline,
-        inputs=[audio_input, state],
-        outputs=[chatbot, state, audio_input]
+        inputs=[audio_input, session_key],
+        outputs=[chatbot, audio_input]
     )
+    clear_btn.click(clear_session, inputs=[session_key])
+    app.load(restore_session, inputs=[session_key], outputs=[session_key, chatbot])
 
 if __name__ == "__main__":
-    app.launch(server_name="0.0.0.0", server_port=1111)
\ No newline at end of file
+    try:
+        app.launch(server_name="0.0.0.0", server_port=1111)
+    finally:
+        sessions.close()
\ No newline at end of file
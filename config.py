@@ -5,9 +5,20 @@ import os
 API_KEY = "YOUR-API-KEY"
 BASE_URL = "YOUR-BASE-URL"
 MODEL_NAME = "YOUR-MODEL-NAME"
+ANALYZER_MODEL = "deepseek-chat"  # model used by CognitiveAnalyzer (app + evaluation)
 
 # Whisper Configuration
 MODEL_SIZE = "medium" 
 DEVICE = "cpu"
 COMPUTE_TYPE = "int8"
-BEAM_SIZE = 5
\ No newline at end of file
+BEAM_SIZE = 5
+
+# Session Store Configuration
+SESSION_MAX_TURNS = 20
+SESSION_MAX_BYTES = 64 * 1024
+SESSION_MAX_COUNT = 1000
+SESSION_TTL = 3600              # seconds an idle session stays in memory
+SESSION_DB_PATH = "sessions.db" # set to None to disable SQLite persistence
+SESSION_PERSIST_TTL = 7 * 24 * 3600  # seconds a persisted session is kept in SQLite
+SESSION_FLUSH_INTERVAL = 5
+SESSION_SECRET = "CHANGE-ME"    # fixed key for the browser-stored session id; must stay stable across restarts
\ No newline at end of file
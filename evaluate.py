@@ -7,7 +7,9 @@ from sklearn.metrics import (
     precision_recall_fscore_support,
     classification_report
 )
-from analysis_module import CognitiveAnalyzer
+from analysis_module import CognitiveAnalyzer, EVAL_PROMPTS
+from run_registry import RunWriter, prompts_hash
+import config
 
 DATASET_FILES = [
     "data/dataset_v1_definition.json",
@@ -50,52 +52,60 @@ def evaluate_dataset(path, analyzer):
         "pattern": defaultdict(list)
     }
 
-    for sample in tqdm(dataset, desc="Evaluating"):
-        text = sample["text"]
-        gold = int(sample["gold_label"])
-
-        features = analyzer.analyze_text(text)
-        is_rum, conf, reasoning = analyzer.detect_rumination(
-            features, threshold=THRESHOLD
-        )
-        pred = int(is_rum)
-
-        record = {
-            "id": sample["id"],
-            "gold": gold,
-            "pred": pred,
-            "confidence": conf,
-            "reasoning": reasoning,
-            "analysis": features,
-            "meta": {
-                "domain": sample.get("domain"),
-                "persona": sample.get("persona"),
-                "pattern_id": sample.get("pattern_id"),
-                "method": sample.get("method")
+    with RunWriter(
+        dataset=path,
+        model=analyzer.model,
+        prompts=prompts_hash(EVAL_PROMPTS),
+        run_config={"threshold": THRESHOLD, "base_url": config.BASE_URL}
+    ) as run:
+        for sample in tqdm(dataset, desc="Evaluating"):
+            text = sample["text"]
+            gold = int(sample["gold_label"])
+
+            features = analyzer.analyze_text(text)
+            is_rum, conf, reasoning = analyzer.detect_rumination(
+                features, threshold=THRESHOLD
+            )
+            pred = int(is_rum)
+
+            record = {
+                "id": sample["id"],
+                "gold": gold,
+                "pred": pred,
+                "confidence": conf,
+                "reasoning": reasoning,
+                "analysis": features,
+                "meta": {
+                    "domain": sample.get("domain"),
+                    "persona": sample.get("persona"),
+                    "pattern_id": sample.get("pattern_id"),
+                    "method": sample.get("method")
+                }
             }
-        }
 
-        predictions.append(record)
+            predictions.append(record)
+            run.add(record)
 
-        y_true.append(gold)
-        y_pred.append(pred)
-        y_score.append(conf)
+            y_true.append(gold)
+            y_pred.append(pred)
+            y_score.append(conf)
 
-        if pred != gold:
-            errors.append({**record, "text": text, "question": sample.get("question")})
+            if pred != gold:
+                errors.append({**record, "text": text, "question": sample.get("question")})
 
-        if sample.get("domain"):
-            groups["domain"][sample["domain"]].append(record)
-        if sample.get("persona"):
-            groups["persona"][sample["persona"]].append(record)
-        if sample.get("pattern_id"):
-            groups["pattern"][sample["pattern_id"]].append(record)
+            if sample.get("domain"):
+                groups["domain"][sample["domain"]].append(record)
+            if sample.get("persona"):
+                groups["persona"][sample["persona"]].append(record)
+            if sample.get("pattern_id"):
+                groups["pattern"][sample["pattern_id"]].append(record)
 
-    y_true = np.array(y_true)
-    y_pred = np.array(y_pred)
-    y_score = np.array(y_score)
+        y_true = np.array(y_true)
+        y_pred = np.array(y_pred)
+        y_score = np.array(y_score)
 
-    overall = compute_metrics(y_true, y_pred, y_score)
+        overall = compute_metrics(y_true, y_pred, y_score)
+        run_id = run.finish(overall)
 
     print("\n--- Overall ---")
     print(json.dumps(overall, indent=2))
@@ -123,6 +133,7 @@ def evaluate_dataset(path, analyzer):
     json.dump(group_metrics, open(f"results/{prefix}_groups.json", "w", encoding="utf-8"), indent=2, ensure_ascii=False)
 
     print(f"Saved: results/{prefix}_*.json")
+    print(f"Registered run: {run_id}")
 
 def main():
     analyzer = CognitiveAnalyzer()
@@ -0,0 +1,237 @@
+# run_registry.py
+import os
+import json
+import time
+import uuid
+import hashlib
+import argparse
+
+REGISTRY_DIR = "results/runs"
+INDEX_FILE = os.path.join(REGISTRY_DIR, "index.jsonl")
+
+# ================= Tagging =================
+def prompts_hash(prompts):
+    """
+    Hashes the prompt texts sent during evaluation, so only a prompt change
+    (not a cosmetic code edit) yields a new tag.
+    """
+    digest = hashlib.sha256()
+    for prompt in prompts:
+        digest.update(prompt.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:12]
+
+# Columns kept in the lean prediction file; everything else goes to the sidecar.
+CORE_FIELDS = ("id", "gold", "pred", "confidence")
+
+def _run_path(run_id):
+    return os.path.join(REGISTRY_DIR, f"{run_id}.jsonl")
+
+def _details_path(run_id):
+    return os.path.join(REGISTRY_DIR, f"{run_id}.details.jsonl")
+
+def _dump(record):
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+# ================= Writing =================
+class RunWriter:
+    """
+    Appends one lean JSON line (CORE_FIELDS only) per prediction to
+    <run_id>.jsonl, and the verbose fields (reasoning, analysis, meta) to
+    <run_id>.details.jsonl, so compare never decodes them. Both are written
+    as .tmp files; finish() renames them and adds the run to the index.
+    Used as a context manager, a run that raises before finish() is deleted.
+    """
+    def __init__(self, dataset, model, prompts, run_config):
+        os.makedirs(REGISTRY_DIR, exist_ok=True)
+        name = os.path.splitext(os.path.basename(dataset))[0]
+        self.run_id = f"{time.strftime('%Y%m%d-%H%M%S')}_{name}_{prompts}_{uuid.uuid4().hex[:4]}"
+        self.meta = {
+            "run_id": self.run_id,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "dataset": dataset,
+            "model": model,
+            "prompts_hash": prompts,
+            "config": run_config
+        }
+        self.n = 0
+        self._paths = [_run_path(self.run_id), _details_path(self.run_id)]
+        self._fh = open(self._paths[0] + ".tmp", "w", encoding="utf-8")
+        self._details = open(self._paths[1] + ".tmp", "w", encoding="utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self._fh.closed:
+            self.abort()
+        return False
+
+    def add(self, record):
+        self._fh.write(_dump({k: record[k] for k in CORE_FIELDS}))
+        details = {k: v for k, v in record.items() if k not in CORE_FIELDS or k == "id"}
+        self._details.write(_dump(details))
+        self.n += 1
+
+    def abort(self):
+        self._fh.close()
+        self._details.close()
+        for path in self._paths:
+            if os.path.exists(path + ".tmp"):
+                os.remove(path + ".tmp")
+
+    def finish(self, summary):
+        self._fh.close()
+        self._details.close()
+        for path in self._paths:
+            os.replace(path + ".tmp", path)
+        entry = {**self.meta, "n_samples": self.n, "summary": summary}
+        with open(INDEX_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return self.run_id
+
+# ================= Reading =================
+def load_index():
+    if not os.path.exists(INDEX_FILE):
+        return []
+    with open(INDEX_FILE, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def get_run(run_id, index=None):
+    """
+    Resolves a run by exact id or unique prefix.
+    """
+    index = load_index() if index is None else index
+    matches = [r for r in index if r["run_id"] == run_id]
+    if not matches:
+        matches = [r for r in index if r["run_id"].startswith(run_id)]
+    if not matches:
+        raise KeyError(f"Unknown run '{run_id}'")
+    if len(matches) > 1:
+        candidates = ", ".join(r["run_id"] for r in matches)
+        raise KeyError(f"Ambiguous run '{run_id}', candidates: {candidates}")
+    return matches[0]
+
+def iter_predictions(run_id, details=False):
+    """
+    Yields the lean prediction lines, or the verbose sidecar with details=True.
+    """
+    path = _details_path(run_id) if details else _run_path(run_id)
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+# ================= Comparison =================
+def compare_runs(run_a, run_b):
+    """
+    Streams both prediction files: only (gold, pred, confidence) of run A
+    is held in memory, run B is read line by line.
+    """
+    index = load_index()
+    meta_a = get_run(run_a, index)
+    meta_b = get_run(run_b, index)
+
+    base = {
+        r["id"]: (r["gold"], r["pred"], r["confidence"])
+        for r in iter_predictions(meta_a["run_id"])
+    }
+
+    flips, only_b = [], 0
+    for r in iter_predictions(meta_b["run_id"]):
+        prev = base.pop(r["id"], None)
+        if prev is None:
+            only_b += 1
+            continue
+        gold, pred_a, conf_a = prev
+        if pred_a != r["pred"]:
+            flips.append({
+                "id": r["id"],
+                "gold": gold,
+                "pred_a": pred_a,
+                "pred_b": r["pred"],
+                "confidence_a": conf_a,
+                "confidence_b": r["confidence"],
+                "fixed": r["pred"] == gold
+            })
+
+    deltas = {}
+    sum_a, sum_b = meta_a.get("summary", {}), meta_b.get("summary", {})
+    for key in ("precision", "recall", "f1", "auc"):
+        a, b = sum_a.get(key), sum_b.get(key)
+        deltas[key] = {
+            "a": a,
+            "b": b,
+            "delta": None if a is None or b is None else b - a
+        }
+
+    return {
+        "run_a": meta_a,
+        "run_b": meta_b,
+        "metrics": deltas,
+        "flips": flips,
+        "only_in_a": len(base),
+        "only_in_b": only_b
+    }
+
+def _fmt(value):
+    return "  n/a " if value is None else f"{value:.4f}"
+
+def print_comparison(result):
+    a, b = result["run_a"], result["run_b"]
+    print(f"A: {a['run_id']}  (model={a['model']}, prompts={a['prompts_hash']})")
+    print(f"B: {b['run_id']}  (model={b['model']}, prompts={b['prompts_hash']})")
+    if a["dataset"] != b["dataset"]:
+        print(f"⚠️ Different datasets: {a['dataset']} vs {b['dataset']}")
+
+    print("\n--- Metrics ---")
+    for key, m in result["metrics"].items():
+        delta = "" if m["delta"] is None else f"{m['delta']:+.4f}"
+        print(f"{key:<10} {_fmt(m['a'])} -> {_fmt(m['b'])}  {delta}")
+
+    flips = result["flips"]
+    fixed = sum(1 for f in flips if f["fixed"])
+    print(f"\n--- Flips ({len(flips)}: {fixed} fixed, {len(flips) - fixed} broken) ---")
+    for f in flips:
+        tag = "FIXED " if f["fixed"] else "BROKEN"
+        print(f"[{tag}] {f['id']}  gold={f['gold']}  "
+              f"pred {f['pred_a']} -> {f['pred_b']}  "
+              f"conf {f['confidence_a']} -> {f['confidence_b']}")
+
+    if result["only_in_a"] or result["only_in_b"]:
+        print(f"\nUnmatched samples: {result['only_in_a']} only in A, {result['only_in_b']} only in B")
+
+# ================= CLI =================
+def main():
+    parser = argparse.ArgumentParser(description="Browse and compare evaluation runs")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_list = sub.add_parser("list", help="List registered runs")
+    p_list.add_argument("--dataset", help="Only show runs whose dataset contains this string")
+
+    p_cmp = sub.add_parser("compare", help="Compare two runs (id or unique prefix)")
+    p_cmp.add_argument("run_a")
+    p_cmp.add_argument("run_b")
+    p_cmp.add_argument("--json", action="store_true", help="Print the raw comparison as JSON")
+
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for r in load_index():
+            if args.dataset and args.dataset not in r["dataset"]:
+                continue
+            s = r.get("summary", {})
+            print(f"{r['run_id']}  {r['model']}  prompts={r['prompts_hash']}  "
+                  f"n={r['n_samples']}  f1={_fmt(s.get('f1'))}  auc={_fmt(s.get('auc'))}")
+    elif args.command == "compare":
+        try:
+            result = compare_runs(args.run_a, args.run_b)
+        except KeyError as e:
+            parser.error(e.args[0])
+        if args.json:
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+        else:
+            print_comparison(result)
+
+if __name__ == "__main__":
+    main()
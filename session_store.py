@@ -0,0 +1,303 @@
+# session_store.py
+import json
+import time
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Never overwrite a row with an older snapshot (flush and eviction may race).
+_UPSERT = (
+    "INSERT INTO sessions (session_id, history, updated) VALUES (?, ?, ?) "
+    "ON CONFLICT(session_id) DO UPDATE SET history = excluded.history, updated = excluded.updated "
+    "WHERE excluded.updated >= sessions.updated"
+)
+
+# Sentinel: the SQLite row for a session has not been read yet.
+_UNREAD = object()
+
+def _size(history):
+    return len(json.dumps(history, ensure_ascii=False).encode("utf-8"))
+
+def _clip(text, nbytes):
+    return text.encode("utf-8")[:max(nbytes, 0)].decode("utf-8", "ignore")
+
+class _Session:
+    __slots__ = ("history", "nbytes", "last_access")
+
+    def __init__(self, history):
+        self.history = history
+        self.nbytes = _size(history)
+        self.last_access = time.time()
+
+class SessionStore:
+    """
+    Server-side chat history keyed by session id.
+    - Per-session caps: oldest turns are dropped beyond max_turns / max_bytes;
+      a single turn larger than max_bytes has its messages truncated.
+    - Global caps: least recently used sessions are evicted beyond max_sessions,
+      and sessions idle for longer than ttl seconds are evicted on access.
+    - Optional write-behind persistence to SQLite (db_path), flushed every
+      flush_interval seconds so sessions survive restarts. All SQLite I/O
+      happens outside the session lock; evicted sessions wait in memory
+      until the next flush.
+    """
+    def __init__(self, max_turns=20, max_bytes=64 * 1024, max_sessions=1000,
+                 ttl=3600, db_path=None, flush_interval=5.0, persist_ttl=7 * 24 * 3600):
+        self.max_turns = max_turns
+        self.max_bytes = max_bytes
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.persist_ttl = persist_ttl
+
+        self._sessions = OrderedDict()
+        self._dirty = set()
+        self._deleted = set()
+        self._evicted = {}
+        self._flush_gen = 0
+        self._lock = threading.Lock()
+        self._stats = {"evicted_lru": 0, "evicted_ttl": 0, "trimmed_turns": 0, "truncated_turns": 0}
+
+        self._db = None
+        self._db_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._flusher = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, history TEXT NOT NULL, updated REAL NOT NULL)"
+            )
+            self._db.commit()
+            self._flusher = threading.Thread(
+                target=self._flush_loop, args=(flush_interval,), daemon=True
+            )
+            self._flusher.start()
+
+    # ================= Public API =================
+    def get(self, session_id):
+        """
+        Returns a copy of the session history (empty list for new sessions).
+        """
+        with self._open(session_id) as session:
+            return list(session.history) if session else []
+
+    def append(self, session_id, user_text, bot_reply):
+        """
+        Records one turn and returns the (possibly trimmed) history copy.
+        """
+        with self._open(session_id) as session:
+            if session is None:
+                session = _Session([])
+                self._sessions[session_id] = session
+            session.history.append({"role": "user", "content": user_text})
+            session.history.append({"role": "assistant", "content": bot_reply})
+            self._trim(session)
+            self._dirty.add(session_id)
+            self._deleted.discard(session_id)
+            self._evict_lru()
+            return list(session.history)
+
+    def clear(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._dirty.discard(session_id)
+            self._evicted.pop(session_id, None)
+            if self._db is not None:
+                self._deleted.add(session_id)
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "bytes": sum(s.nbytes for s in self._sessions.values()),
+                # Evicted snapshots still held in memory until the next successful flush.
+                "pending_bytes": sum(len(row[0].encode("utf-8")) for row in self._evicted.values()),
+                "turns": sum(len(s.history) // 2 for s in self._sessions.values()),
+                "dirty": len(self._dirty) + len(self._evicted),
+                **self._stats
+            }
+
+    def flush(self):
+        """
+        Writes dirty sessions to SQLite and drops cleared / long-expired rows.
+        """
+        if self._db is None:
+            return
+        with self._lock:
+            rows = [
+                (sid, json.dumps(self._sessions[sid].history, ensure_ascii=False),
+                 self._sessions[sid].last_access)
+                for sid in self._dirty if sid in self._sessions
+            ]
+            evicted = list(self._evicted.items())
+            deleted = list(self._deleted)
+            self._dirty.clear()
+            # Rows read from here until the commit may be stale: _open re-reads them.
+            self._flush_gen += 1
+        try:
+            with self._db_lock:
+                try:
+                    self._db.executemany(_UPSERT, rows)
+                    self._db.executemany(_UPSERT, [(sid, *row) for sid, row in evicted])
+                    self._db.executemany(
+                        "DELETE FROM sessions WHERE session_id = ?", [(sid,) for sid in deleted]
+                    )
+                    self._db.execute(
+                        "DELETE FROM sessions WHERE updated < ?", (time.time() - self.persist_ttl,)
+                    )
+                    self._db.commit()
+                except Exception:
+                    self._db.rollback()
+                    raise
+        except Exception:
+            with self._lock:
+                # Nothing reached disk: mark the snapshots dirty again for the next flush.
+                for sid, history_json, updated in rows:
+                    if sid in self._sessions:
+                        self._dirty.add(sid)
+                    elif sid not in self._deleted:
+                        self._evicted.setdefault(sid, (history_json, updated))
+            raise
+        with self._lock:
+            # Evicted and cleared sessions stay visible in memory until they are on disk.
+            for sid, row in evicted:
+                if self._evicted.get(sid) is row:
+                    del self._evicted[sid]
+            self._deleted.difference_update(deleted)
+            self._flush_gen += 1
+
+    def close(self):
+        if self._db is None:
+            return
+        self._stop.set()
+        self._flusher.join()
+        self.flush()
+        self._db.close()
+        self._db = None
+
+    # ================= Internals =================
+    @contextmanager
+    def _open(self, session_id):
+        """
+        Yields the session (or None) with self._lock held. A session that is
+        only on disk is read with the lock released, then looked up again.
+        """
+        row, gen = _UNREAD, None
+        while True:
+            self._lock.acquire()
+            session = self._touch(session_id, row if gen == self._flush_gen else _UNREAD)
+            if session is not _UNREAD:
+                break
+            gen = self._flush_gen
+            self._lock.release()
+            row = self._select(session_id)
+        try:
+            yield session
+        finally:
+            self._lock.release()
+
+    def _select(self, session_id):
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT history FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return None if row is None else row[0]
+
+    # ================= Internals (caller holds self._lock) =================
+    def _touch(self, session_id, row):
+        now = time.time()
+        self._evict_idle(now)
+        session = self._sessions.get(session_id)
+        if session is None:
+            if session_id in self._evicted:
+                session = self._restore(self._evicted.pop(session_id)[0])
+                self._dirty.add(session_id)
+            elif self._db is None or session_id in self._deleted:
+                return None
+            elif row is _UNREAD:
+                return _UNREAD
+            elif row is None:
+                return None
+            else:
+                session = self._restore(row)
+            self._sessions[session_id] = session
+            self._evict_lru()
+        self._sessions.move_to_end(session_id)
+        session.last_access = now
+        return session
+
+    def _trim(self, session):
+        history = session.history
+        dropped = 0
+        while len(history) > 2 * self.max_turns:
+            del history[:2]
+            dropped += 1
+        session.nbytes = _size(history)
+        while session.nbytes > self.max_bytes and len(history) > 2:
+            del history[:2]
+            dropped += 1
+            session.nbytes = _size(history)
+        if session.nbytes > self.max_bytes and history:
+            # A single turn is over the cap on its own: cut its messages down.
+            self._stats["truncated_turns"] += 1
+            # Largest per-message budget that fits; JSON escaping means the
+            # serialized size can exceed the raw byte budget, so search for it.
+            turn = list(history)
+            def clipped(budget):
+                return [{**m, "content": _clip(m["content"], budget)} for m in turn]
+            lo, hi = 0, max(len(m["content"].encode("utf-8")) for m in turn)
+            while lo < hi:
+                mid = (lo + hi + 1) // 2
+                if _size(clipped(mid)) <= self.max_bytes:
+                    lo = mid
+                else:
+                    hi = mid - 1
+            history[:] = clipped(lo)
+            session.nbytes = _size(history)
+            if session.nbytes > self.max_bytes:
+                # Even the empty messages exceed the cap: drop the turn.
+                history.clear()
+                session.nbytes = _size(history)
+                dropped += 1
+        self._stats["trimmed_turns"] += dropped
+
+    def _evict_idle(self, now):
+        # OrderedDict is kept in access order, so idle sessions sit at the front.
+        while self._sessions:
+            sid, session = next(iter(self._sessions.items()))
+            if now - session.last_access <= self.ttl:
+                break
+            self._evict(sid)
+            self._stats["evicted_ttl"] += 1
+
+    def _evict_lru(self):
+        while len(self._sessions) > self.max_sessions:
+            sid = next(iter(self._sessions))
+            self._evict(sid)
+            self._stats["evicted_lru"] += 1
+
+    def _evict(self, session_id):
+        session = self._sessions.pop(session_id)
+        dirty = session_id in self._dirty
+        self._dirty.discard(session_id)
+        if self._db is not None and dirty:
+            # Handed to the next flush so eviction never loses a turn.
+            self._evicted[session_id] = (
+                json.dumps(session.history, ensure_ascii=False), session.last_access
+            )
+
+    def _restore(self, history_json):
+        session = _Session(json.loads(history_json))
+        self._trim(session)
+        return session
+
+    def _flush_loop(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"❌ Session flush failed: {e}")